@@ -21,32 +21,139 @@ You can extend by adding more scenarios, a Flask web UI, or unit tests.
 
 import ipaddress
 import argparse
+import collections
 import csv
 import json
+import os
+import socket
+import struct
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import Optional, List, Tuple, Union
 import datetime
 
+try:
+    import numpy as np  # optional: enables vectorized batch evaluation
+except ImportError:
+    np = None
+
+try:
+    from firewall_numba import match_all as _numba_match_all  # optional JIT path
+except ImportError:
+    _numba_match_all = None
+
+try:
+    import _firewall  # optional: Cython matcher (see setup.py), no JIT warm-up
+except ImportError:
+    _firewall = None
+
+try:
+    import pytricia  # optional: C radix trie for src CIDR prefiltering
+except ImportError:
+    pytricia = None
+
+try:
+    import orjson  # optional: much faster JSON export
+except ImportError:
+    orjson = None
+
+try:
+    import intervaltree  # optional: O(log n) port-range candidate lookup
+except ImportError:
+    intervaltree = None
+
+# IANA protocol numbers used to encode protocols as small ints for batching
+PROTO = {'ANY': 0, 'ICMP': 1, 'TCP': 6, 'UDP': 17}
+PROTO_NAMES = {v: k for k, v in PROTO.items()}
+
+# packed on-disk layout for binary packet files: 13 bytes per packet
+PACKET_DTYPE = np.dtype([('src_ip', '<u4'), ('dst_ip', '<u4'),
+                         ('src_port', '<u2'), ('dst_port', '<u2'),
+                         ('proto', 'u1')]) if np is not None else None
+
+def ip2int(s: str) -> int:
+    """Dotted-quad string to int; ~10x faster than ipaddress parsing."""
+    return struct.unpack('!I', socket.inet_aton(s))[0]
+
 # ----------------------------- Models ---------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Packet:
     src_ip: str
     dst_ip: str
     src_port: int
     dst_port: int
     proto: str  # e.g., 'TCP' or 'UDP'
-
-    def to_dict(self):
-        return {
-            'src_ip': self.src_ip,
-            'dst_ip': self.dst_ip,
-            'src_port': self.src_port,
-            'dst_port': self.dst_port,
-            'proto': self.proto
-        }
-
-@dataclass
+    _src_ip_int: int = field(init=False, repr=False)
+    _dst_ip_int: int = field(init=False, repr=False)
+    _proto: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Parse the IP strings once so matching is pure integer arithmetic.
+        try:
+            self._src_ip_int = ip2int(self.src_ip)
+            self._dst_ip_int = ip2int(self.dst_ip)
+        except OSError as e:
+            raise ValueError(f'invalid IP in {self.src_ip!r} -> {self.dst_ip!r}: {e}') from None
+        self._proto = PROTO.get(self.proto.upper(), 0)
+
+class PacketBatch:
+    """Structure-of-arrays packet container.
+
+    Holds one parallel column per packet field instead of a list of Packet
+    objects, so rule checks can run as vectorized NumPy ops over contiguous
+    memory. Falls back to plain Python lists when NumPy is not installed.
+    """
+
+    def __init__(self, src_ip, dst_ip, src_port, dst_port, proto):
+        self.src_ip = src_ip      # uint32 address ints
+        self.dst_ip = dst_ip
+        self.src_port = src_port  # uint16
+        self.dst_port = dst_port
+        self.proto = proto        # uint8 IANA protocol numbers (see PROTO)
+
+    def __len__(self):
+        return len(self.src_ip)
+
+    @classmethod
+    def from_packets(cls, packets: List[Packet]) -> 'PacketBatch':
+        n = len(packets)
+        if np is not None:
+            return cls(
+                np.fromiter((p._src_ip_int for p in packets), dtype=np.uint32, count=n),
+                np.fromiter((p._dst_ip_int for p in packets), dtype=np.uint32, count=n),
+                np.fromiter((p.src_port for p in packets), dtype=np.uint16, count=n),
+                np.fromiter((p.dst_port for p in packets), dtype=np.uint16, count=n),
+                np.fromiter((p._proto for p in packets), dtype=np.uint8, count=n),
+            )
+        return cls(
+            [p._src_ip_int for p in packets],
+            [p._dst_ip_int for p in packets],
+            [p.src_port for p in packets],
+            [p.dst_port for p in packets],
+            [p._proto for p in packets],
+        )
+
+    def ascontiguous(self) -> 'PacketBatch':
+        """Repack any strided columns (e.g. memmap field views) so the
+        vectorized matchers run over contiguous, SIMD-friendly memory."""
+        cols = (self.src_ip, self.dst_ip, self.src_port, self.dst_port, self.proto)
+        if np is None or not isinstance(self.src_ip, np.ndarray):
+            return self
+        if all(c.flags['C_CONTIGUOUS'] for c in cols):
+            return self
+        return PacketBatch(*(np.ascontiguousarray(c) for c in cols))
+
+    @classmethod
+    def from_binary(cls, path: str) -> 'PacketBatch':
+        """Memory-map a PACKET_DTYPE file; zero-copy, no Packet objects."""
+        if np is None:
+            raise RuntimeError('NumPy is required to load binary packet files')
+        mm = np.memmap(path, dtype=PACKET_DTYPE, mode='r')
+        return cls(mm['src_ip'], mm['dst_ip'],
+                   mm['src_port'], mm['dst_port'], mm['proto'])
+
+@dataclass(slots=True)
 class Rule:
     id: str
     action: str  # 'ALLOW' or 'DENY'
@@ -56,99 +163,665 @@ class Rule:
     dst_ports: Optional[Union[int, Tuple[int,int]]] = None
     proto: Optional[str] = None  # 'TCP'/'UDP'/None
     description: Optional[str] = None
+    _src_net_int: int = field(init=False, repr=False)
+    _src_mask: int = field(init=False, repr=False)
+    _dst_net_int: int = field(init=False, repr=False)
+    _dst_mask: int = field(init=False, repr=False)
+    _src_port_range: Tuple[int, int] = field(init=False, repr=False)
+    _dst_port_range: Tuple[int, int] = field(init=False, repr=False)
+    _proto: Optional[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Precompile every predicate once at construction so the per-packet
+        # check in matches_packet is a handful of integer compares.
+        # A None field compiles to a predicate that matches anything:
+        # mask 0 for nets, (0, 65535) for ports.
+        self._src_net_int, self._src_mask = self._compile_net(self.src_net)
+        self._dst_net_int, self._dst_mask = self._compile_net(self.dst_net)
+        self._src_port_range = self._compile_ports(self.src_ports)
+        self._dst_port_range = self._compile_ports(self.dst_ports)
+        self._proto = self._compile_proto(self.proto)
+
+    @staticmethod
+    def _compile_net(cidr):
+        """Compile a CIDR string to an (network_int, netmask_int) pair.
+
+        Raises ValueError at construction so misconfigured rules fail
+        loudly instead of silently never matching.
+        """
+        if not cidr:
+            return 0, 0  # (ip & 0) == 0 matches any address
+        ip_part, _, plen_part = cidr.partition('/')
+        try:
+            net_int = ip2int(ip_part)
+            plen = int(plen_part) if plen_part else 32
+        except (OSError, ValueError):
+            raise ValueError(f'invalid CIDR {cidr!r}') from None
+        if not 0 <= plen <= 32:
+            raise ValueError(f'invalid CIDR {cidr!r}: bad prefix length')
+        mask = (0xFFFFFFFF << (32 - plen)) & 0xFFFFFFFF
+        if net_int & ~mask:
+            raise ValueError(f'invalid CIDR {cidr!r}: host bits set')
+        return net_int, mask
+
+    @staticmethod
+    def _compile_proto(proto):
+        """Intern a protocol name as its IANA number; None/'ANY' match all."""
+        if proto is None:
+            return None
+        code = PROTO.get(proto.upper())
+        if code is None:
+            raise ValueError(f'unknown protocol: {proto!r}')
+        return code or None  # 'ANY' (0) also matches everything
+
+    @staticmethod
+    def _compile_ports(ports):
+        """Normalize a port spec (None, single port or (min,max)) to (lo, hi)."""
+        if ports is None:
+            return 0, 65535
+        if isinstance(ports, tuple):
+            lo, hi = ports
+        else:
+            lo = hi = int(ports)
+        if not (0 <= lo <= hi <= 65535):
+            raise ValueError(f'invalid port spec {ports!r}')
+        return lo, hi
 
     def matches_packet(self, pkt: Packet) -> bool:
-        # IP checks
-        if self.src_net:
-            try:
-                net = ipaddress.ip_network(self.src_net)
-                if ipaddress.ip_address(pkt.src_ip) not in net:
-                    return False
-            except ValueError:
-                return False
-        if self.dst_net:
-            try:
-                net = ipaddress.ip_network(self.dst_net)
-                if ipaddress.ip_address(pkt.dst_ip) not in net:
-                    return False
-            except ValueError:
-                return False
-
-        # Protocol check
-        if self.proto and self.proto.upper() != pkt.proto.upper():
+        if (pkt._src_ip_int & self._src_mask) != self._src_net_int:
             return False
-
-        # Port checks
-        if self.src_ports is not None:
-            if isinstance(self.src_ports, tuple):
-                lo, hi = self.src_ports
-                if not (lo <= pkt.src_port <= hi):
-                    return False
-            else:
-                if pkt.src_port != int(self.src_ports):
-                    return False
-
-        if self.dst_ports is not None:
-            if isinstance(self.dst_ports, tuple):
-                lo, hi = self.dst_ports
-                if not (lo <= pkt.dst_port <= hi):
-                    return False
-            else:
-                if pkt.dst_port != int(self.dst_ports):
-                    return False
-
-        return True
+        if (pkt._dst_ip_int & self._dst_mask) != self._dst_net_int:
+            return False
+        if self._proto is not None and self._proto != pkt._proto:
+            return False
+        lo, hi = self._src_port_range
+        if not (lo <= pkt.src_port <= hi):
+            return False
+        lo, hi = self._dst_port_range
+        return lo <= pkt.dst_port <= hi
 
 # -------------------------- Rule Engine --------------------------------
 
+class _HorusBlock:
+    """A contiguous run of exact (dst_port, proto) rules as one dict probe.
+
+    Collapsing the run preserves first-match-wins: the rules are adjacent,
+    so nothing can match between them, and duplicate keys keep the first
+    rule's outcome. The zeroed net attributes let the block sit in the
+    same structures (trie, field masks) as a plain Rule.
+    """
+    __slots__ = ('table',)
+
+    # wildcard nets, mirroring Rule's precompiled predicates
+    _src_net_int = _src_mask = 0
+    _dst_net_int = _dst_mask = 0
+
+    def __init__(self, rules: List[Rule]):
+        self.table = {}
+        for rule in rules:
+            key = (rule._dst_port_range[0], rule._proto)
+            self.table.setdefault(key, (rule.action.upper(), rule.id))
+
+    def lookup(self, pkt: Packet) -> Optional[Tuple[str, str]]:
+        return self.table.get((pkt.dst_port, pkt._proto))
+
+class _TrieNode:
+    __slots__ = ('children', 'rules', 'mask')
+
+    def __init__(self):
+        self.children = None  # allocated lazily as a 256-slot list
+        self.rules = []       # candidate rule indices, in ruleset order
+        self.mask = 0         # same candidates as a bitvector (bit i = rule i)
+
+class PrefixTrie:
+    """Multi-bit trie over destination prefixes with an 8-bit stride.
+
+    Each level consumes one byte of the address, so a lookup walks at most
+    four nodes instead of scanning every rule. Rules whose prefix ends
+    mid-byte are duplicated into every slot they cover, and shorter
+    prefixes are leaf-pushed down into existing subtrees, so the node a
+    lookup stops at holds the complete candidate list in ruleset order.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.root = _TrieNode()
+        for idx, rule in enumerate(rules):
+            prefix_len = bin(rule._dst_mask).count('1')
+            self._insert(self.root, idx, rule._dst_net_int, prefix_len, 0)
+        self._push_down(self.root)
+
+    def _insert(self, node, idx, net, prefix_len, depth):
+        if prefix_len <= depth * 8:
+            node.rules.append(idx)
+            return
+        byte = (net >> (24 - 8 * depth)) & 0xFF
+        remaining = prefix_len - depth * 8
+        if remaining >= 8:
+            self._insert(self._child(node, byte), idx, net, prefix_len, depth + 1)
+        else:
+            # prefix ends mid-byte: duplicate into every covered slot
+            span = 1 << (8 - remaining)
+            base = byte & ~(span - 1)
+            for b in range(base, base + span):
+                self._child(node, b).rules.append(idx)
+
+    @staticmethod
+    def _child(node, byte):
+        if node.children is None:
+            node.children = [None] * 256
+        if node.children[byte] is None:
+            node.children[byte] = _TrieNode()
+        return node.children[byte]
+
+    def _push_down(self, node):
+        # leaf-push: fold this node's candidates into every existing child
+        for idx in node.rules:
+            node.mask |= 1 << idx
+        if node.children is None:
+            return
+        for child in node.children:
+            if child is not None:
+                child.rules = sorted(node.rules + child.rules)
+                self._push_down(child)
+
+    def _walk(self, dst_ip_int: int) -> _TrieNode:
+        node = self.root
+        for shift in (24, 16, 8, 0):
+            if node.children is None:
+                break
+            child = node.children[(dst_ip_int >> shift) & 0xFF]
+            if child is None:
+                break
+            node = child
+        return node
+
+    def lookup(self, dst_ip_int: int) -> List[int]:
+        """Candidate rule indices for an address, in ruleset order."""
+        return self._walk(dst_ip_int).rules
+
+    def lookup_mask(self, dst_ip_int: int) -> int:
+        """Candidate rule indices for an address, as a bitvector."""
+        return self._walk(dst_ip_int).mask
+
 class RuleEngine:
-    def __init__(self, rules: List[Rule], default_action: str = 'ALLOW'):
+    # above this many rules the generated straight-line matcher stops paying
+    # for itself and the bitvector pipeline takes over
+    CODEGEN_MAX_RULES = 30
+    # packets between attempts to re-sort hot rules to the front
+    REORDER_INTERVAL = 65536
+
+    def __init__(self, rules: List[Rule], default_action: str = 'ALLOW',
+                 auto_reorder: bool = True):
         self.rules = rules  # rules are evaluated in order
         self.default_action = default_action
+        self.auto_reorder = auto_reorder
+        self._cache_max = 65536
+        self._packets_seen = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """Rebuild derived matching structures (trie, bitvectors, cache,
+        generated matcher).
+
+        Must be called after mutating self.rules in place, e.g.
+        engine.rules.append(rule); until then evaluate keeps answering
+        from the stale structures.
+        """
+        self._rule_cols = None  # built lazily for the compiled matcher
+        self._hits = [0] * len(self.rules)
+        self._id_to_idx = {r.id: i for i, r in enumerate(self.rules)}
+        # collapse runs of exact (dst_port, proto) rules into _HorusBlocks;
+        # the pipeline below then works on plan items instead of raw rules
+        self._plan = self._build_plan()
+        self._dst_trie = PrefixTrie(self._plan)
+        self._src_trie, self._src_trie_any = self._build_src_trie()
+        # per-field candidate bitvectors (bit i = plan item i) for the
+        # early-exit pipeline in _match
+        self._proto_masks, self._proto_wild = self._build_proto_masks()
+        self._sport_index = self._build_port_index(False)
+        self._dport_index = self._build_port_index(True)
+        # flow cache: 5-tuple -> (action, rule_id), LRU-evicted past _cache_max
+        self._cache = collections.OrderedDict()
+        # small rulesets get a specialized matcher generated at runtime
+        self._match_fn = self._compile() if len(self.rules) <= self.CODEGEN_MAX_RULES else None
+
+    def _compile(self):
+        """Generate a straight-line matcher function for this exact ruleset.
+
+        Unrolls every rule into an if-statement over pre-boxed integer
+        constants, so matching has no loop, no attribute lookups and no
+        per-rule indirection. Regenerated by rebuild() whenever rules change.
+        """
+        lines = ['def _match_rules(sip, dip, sp, dp, proto):']
+        for rule in self.rules:
+            conds = []
+            if rule._src_mask:
+                conds.append(f'(sip & {rule._src_mask:#010x}) == {rule._src_net_int:#010x}')
+            if rule._dst_mask:
+                conds.append(f'(dip & {rule._dst_mask:#010x}) == {rule._dst_net_int:#010x}')
+            if rule._proto is not None:
+                conds.append(f'proto == {rule._proto}')
+            for var, (lo, hi) in (('sp', rule._src_port_range), ('dp', rule._dst_port_range)):
+                if lo == hi:
+                    conds.append(f'{var} == {lo}')
+                elif (lo, hi) != (0, 65535):
+                    conds.append(f'{lo} <= {var} <= {hi}')
+            lines.append(f'    if {" and ".join(conds) or "True"}:')
+            lines.append(f'        return ({rule.action.upper()!r}, {rule.id!r})')
+        lines.append(f'    return ({self.default_action.upper()!r}, None)')
+        namespace = {}
+        exec(compile('\n'.join(lines), '<rules>', 'exec'), namespace)
+        return namespace['_match_rules']
+
+    @staticmethod
+    def _horus_eligible(rule: Rule) -> bool:
+        # matches on nothing but one exact dst port and a concrete protocol
+        lo, hi = rule._dst_port_range
+        return (rule._src_mask == 0 and rule._dst_mask == 0
+                and rule._src_port_range == (0, 65535)
+                and lo == hi and rule._proto is not None)
+
+    def _build_plan(self):
+        plan = []
+        run = []
+        for rule in self.rules:
+            if self._horus_eligible(rule):
+                run.append(rule)
+                continue
+            if run:
+                plan.append(_HorusBlock(run) if len(run) > 1 else run[0])
+                run = []
+            plan.append(rule)
+        if run:
+            plan.append(_HorusBlock(run) if len(run) > 1 else run[0])
+        return plan
+
+    def _build_src_trie(self):
+        """Map src CIDRs to candidate bitvectors via pytricia, if installed.
+
+        Returns (trie, any_mask); trie is None without pytricia and the
+        pipeline keeps checking src nets per candidate instead.
+        """
+        if pytricia is None:
+            return None, 0
+        trie = pytricia.PyTricia(32)
+        any_mask = 0
+        for i, item in enumerate(self._plan):
+            if item._src_mask == 0:
+                any_mask |= 1 << i
+                continue
+            prefix_len = bin(item._src_mask).count('1')
+            cidr = f'{ipaddress.IPv4Address(item._src_net_int)}/{prefix_len}'
+            trie[cidr] = trie.get(cidr, 0) | (1 << i)
+        # fold each prefix's ancestors in, so one longest-prefix lookup
+        # yields every covering rule
+        folded = {}
+        for prefix in trie:
+            m = trie[prefix]
+            parent = trie.parent(prefix)
+            while parent is not None:
+                m |= trie[parent]
+                parent = trie.parent(parent)
+            folded[prefix] = m
+        for prefix, m in folded.items():
+            trie[prefix] = m
+        return trie, any_mask
+
+    def _build_proto_masks(self):
+        wild = 0
+        masks = {}
+        for i, item in enumerate(self._plan):
+            if isinstance(item, _HorusBlock):
+                for _, proto in item.table:
+                    masks[proto] = masks.get(proto, 0) | (1 << i)
+            elif item._proto is None:
+                wild |= 1 << i
+            else:
+                masks[item._proto] = masks.get(item._proto, 0) | (1 << i)
+        for proto in masks:
+            masks[proto] |= wild
+        return masks, wild
+
+    def _build_port_index(self, dst: bool):
+        # (any_mask, {exact_port: mask}, [(lo, hi, mask)], tree) per field;
+        # the IntervalTree replaces the linear range scan when available
+        any_mask = 0
+        exact = {}
+        ranges = []
+        for i, item in enumerate(self._plan):
+            if isinstance(item, _HorusBlock):
+                if dst:
+                    for port, _ in item.table:
+                        exact[port] = exact.get(port, 0) | (1 << i)
+                else:
+                    any_mask |= 1 << i  # blocks never constrain src ports
+                continue
+            lo, hi = item._dst_port_range if dst else item._src_port_range
+            if (lo, hi) == (0, 65535):
+                any_mask |= 1 << i
+            elif lo == hi:
+                exact[lo] = exact.get(lo, 0) | (1 << i)
+            else:
+                ranges.append((lo, hi, 1 << i))
+        tree = None
+        if intervaltree is not None and ranges:
+            tree = intervaltree.IntervalTree(
+                intervaltree.Interval(lo, hi + 1, bit) for lo, hi, bit in ranges)
+        return any_mask, exact, ranges, tree
+
+    @staticmethod
+    def _port_mask(index, port):
+        any_mask, exact, ranges, tree = index
+        m = any_mask | exact.get(port, 0)
+        if tree is not None:
+            for iv in tree[port]:
+                m |= iv.data
+            return m
+        for lo, hi, bit in ranges:
+            if lo <= port <= hi:
+                m |= bit
+        return m
 
     def evaluate(self, pkt: Packet) -> Tuple[str, Optional[str]]:
         """Return (action, matched_rule_id)"""
-        for rule in self.rules:
-            if rule.matches_packet(pkt):
-                return rule.action.upper(), rule.id
-        return self.default_action.upper(), None
+        # flow locality: packets of the same 5-tuple classify identically,
+        # so a cache hit skips the rule walk entirely
+        key = (pkt._src_ip_int, pkt._dst_ip_int, pkt.src_port, pkt.dst_port, pkt.proto)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            result = cached
+        else:
+            result = self._match(pkt)
+            self._cache[key] = result
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+        # track hit frequencies so hot rules can migrate to the front
+        idx = self._id_to_idx.get(result[1])
+        if idx is not None:
+            self._hits[idx] += 1
+        self._packets_seen += 1
+        if self.auto_reorder and self._packets_seen % self.REORDER_INTERVAL == 0:
+            self._reorder_rules()
+        return result
+
+    @staticmethod
+    def _rules_overlap(a: Rule, b: Rule) -> bool:
+        """Whether two rules can match the same packet (so order matters)."""
+        if a._proto is not None and b._proto is not None and a._proto != b._proto:
+            return False
+        for n1, m1, n2, m2 in ((a._src_net_int, a._src_mask, b._src_net_int, b._src_mask),
+                               (a._dst_net_int, a._dst_mask, b._dst_net_int, b._dst_mask)):
+            common = m1 & m2  # prefix masks: nets intersect iff they agree
+            if (n1 & common) != (n2 & common):  # on the shorter prefix
+                return False
+        for (lo1, hi1), (lo2, hi2) in ((a._src_port_range, b._src_port_range),
+                                       (a._dst_port_range, b._dst_port_range)):
+            if lo1 > hi2 or lo2 > hi1:
+                return False
+        return True
+
+    def _reorder_rules(self):
+        """Bubble hot rules toward the front where semantics allow.
+
+        Only adjacent pairs whose match-sets cannot intersect are swapped,
+        so every packet still hits the same rule as before, just sooner.
+        """
+        order = list(range(len(self.rules)))
+        hits, rules = self._hits, self.rules
+        for _ in range(len(order)):
+            changed = False
+            for i in range(len(order) - 1):
+                x, y = order[i], order[i + 1]
+                if hits[y] > hits[x] and not self._rules_overlap(rules[x], rules[y]):
+                    order[i], order[i + 1] = y, x
+                    changed = True
+            if not changed:
+                break
+        if order != sorted(order):
+            self.rules = [rules[i] for i in order]
+            self.rebuild()  # also resets hit counters
+
+    def _match(self, pkt: Packet) -> Tuple[str, Optional[str]]:
+        if self._match_fn is not None:
+            return self._match_fn(pkt._src_ip_int, pkt._dst_ip_int,
+                                  pkt.src_port, pkt.dst_port, pkt._proto)
+        # Early-exit bitvector pipeline: AND per-field candidate bitvectors
+        # together, bailing to the default action as soon as the running
+        # vector hits zero. Fields are ordered most-selective first.
+        default = self.default_action.upper(), None
+        m = self._proto_masks.get(pkt._proto, self._proto_wild)
+        if m == 0:
+            return default
+        m &= self._port_mask(self._dport_index, pkt.dst_port)
+        if m == 0:
+            return default
+        m &= self._port_mask(self._sport_index, pkt.src_port)
+        if m == 0:
+            return default
+        if self._src_trie is not None:
+            m &= self._src_trie.get(pkt.src_ip, 0) | self._src_trie_any
+            if m == 0:
+                return default
+        m &= self._dst_trie.lookup_mask(pkt._dst_ip_int)
+        # resolve remaining candidates lowest set bit first, preserving
+        # first-match-wins: rules need only src CIDR containment checked,
+        # blocks need their exact-key probe
+        sip = pkt._src_ip_int
+        while m:
+            item = self._plan[(m & -m).bit_length() - 1]
+            if isinstance(item, _HorusBlock):
+                hit = item.lookup(pkt)
+                if hit is not None:
+                    return hit
+            elif (sip & item._src_mask) == item._src_net_int:
+                return item.action.upper(), item.id
+            m &= m - 1
+        return default
+
+    def evaluate_batch(self, batch: PacketBatch) -> Tuple[List[str], List[Optional[str]]]:
+        """Evaluate a whole PacketBatch at once; return (actions, rule_ids).
+
+        With NumPy each rule becomes one boolean mask over all packets, and
+        first-match-wins is preserved by only assigning where no earlier rule
+        matched. Without NumPy, falls back to a scalar loop over the columns.
+        """
+        if np is None:
+            return self._evaluate_batch_scalar(batch)
+        batch = batch.ascontiguous()
+        compiled = _numba_match_all or (_firewall.match_all if _firewall else None)
+        if compiled is not None:
+            rule_idx = np.empty(len(batch), dtype=np.int64)
+            compiled(batch.src_ip, batch.dst_ip,
+                     batch.src_port, batch.dst_port, batch.proto,
+                     *self._rule_columns(), rule_idx)
+        else:
+            rule_idx = self._match_batch_numpy(batch)
+        actions_lut = [r.action.upper() for r in self.rules]
+        ids_lut = [r.id for r in self.rules]
+        default = self.default_action.upper()
+        actions = [actions_lut[j] if j >= 0 else default for j in rule_idx]
+        rule_ids = [ids_lut[j] if j >= 0 else None for j in rule_idx]
+        return actions, rule_ids
+
+    def _match_batch_numpy(self, batch: PacketBatch):
+        # One vectorized boolean mask per rule; assign only unmatched slots.
+        n = len(batch)
+        rule_idx = np.full(n, -1, dtype=np.int64)
+        unassigned = np.ones(n, dtype=bool)
+        for i, rule in enumerate(self.rules):
+            m = unassigned & ((batch.src_ip & rule._src_mask) == rule._src_net_int)
+            m &= (batch.dst_ip & rule._dst_mask) == rule._dst_net_int
+            if rule._proto is not None:
+                m &= batch.proto == rule._proto
+            lo, hi = rule._src_port_range
+            m &= (batch.src_port >= lo) & (batch.src_port <= hi)
+            lo, hi = rule._dst_port_range
+            m &= (batch.dst_port >= lo) & (batch.dst_port <= hi)
+            rule_idx[m] = i
+            unassigned &= ~m
+        return rule_idx
+
+    def _rule_columns(self):
+        """Rule predicates as parallel uint arrays for the compiled matcher."""
+        if self._rule_cols is None:
+            rs = self.rules
+            self._rule_cols = (
+                np.array([r._src_net_int for r in rs], dtype=np.uint32),
+                np.array([r._src_mask for r in rs], dtype=np.uint32),
+                np.array([r._dst_net_int for r in rs], dtype=np.uint32),
+                np.array([r._dst_mask for r in rs], dtype=np.uint32),
+                np.array([r._proto or 0 for r in rs], dtype=np.uint8),
+                np.array([r._src_port_range[0] for r in rs], dtype=np.uint16),
+                np.array([r._src_port_range[1] for r in rs], dtype=np.uint16),
+                np.array([r._dst_port_range[0] for r in rs], dtype=np.uint16),
+                np.array([r._dst_port_range[1] for r in rs], dtype=np.uint16),
+            )
+        return self._rule_cols
+
+    def _evaluate_batch_scalar(self, batch: PacketBatch) -> Tuple[List[str], List[Optional[str]]]:
+        # Pure-Python fallback: same integer predicates, one packet at a time.
+        default = self.default_action.upper()
+        rule_protos = [r._proto for r in self.rules]
+        actions, rule_ids = [], []
+        for sip, dip, sp, dp, proto in zip(batch.src_ip, batch.dst_ip,
+                                           batch.src_port, batch.dst_port, batch.proto):
+            action, rule_id = default, None
+            for rule, rproto in zip(self.rules, rule_protos):
+                if (sip & rule._src_mask) != rule._src_net_int:
+                    continue
+                if (dip & rule._dst_mask) != rule._dst_net_int:
+                    continue
+                if rproto is not None and rproto != proto:
+                    continue
+                lo, hi = rule._src_port_range
+                if not (lo <= sp <= hi):
+                    continue
+                lo, hi = rule._dst_port_range
+                if not (lo <= dp <= hi):
+                    continue
+                action, rule_id = rule.action.upper(), rule.id
+                break
+            actions.append(action)
+            rule_ids.append(rule_id)
+        return actions, rule_ids
 
 # ------------------------- Scenario Runner -----------------------------
 
+def _make_record(index, now, src_ip, dst_ip, src_port, dst_port, proto, action, rule_id):
+    # one dict literal per record: no merges, no fieldname zipping
+    return {'index': index, 'timestamp_utc': now,
+            'src_ip': src_ip, 'dst_ip': dst_ip,
+            'src_port': src_port, 'dst_port': dst_port, 'proto': proto,
+            'action': action, 'matched_rule_id': rule_id}
+
+def _evaluate_packets(args):
+    # worker for ScenarioRunner.run_parallel; rebuilds the engine per process
+    rules, default_action, packets = args
+    engine = RuleEngine(rules, default_action=default_action)
+    return engine.evaluate_batch(PacketBatch.from_packets(packets))
+
 class ScenarioRunner:
-    def __init__(self, rules: List[Rule], packets: List[Packet], default_action: str = 'ALLOW'):
+    FIELDNAMES = ('index', 'timestamp_utc', 'src_ip', 'dst_ip', 'src_port',
+                  'dst_port', 'proto', 'action', 'matched_rule_id')
+
+    def __init__(self, rules: List[Rule], packets: Union[List[Packet], PacketBatch],
+                 default_action: str = 'ALLOW'):
         self.engine = RuleEngine(rules, default_action=default_action)
-        self.packets = packets
-        self.results = []
+        if isinstance(packets, PacketBatch):
+            self.packets = None
+            self.batch = packets
+        else:
+            self.packets = packets
+            self.batch = None
+        self.actions = None
+        self.matched_rule_ids = None
+        self.run_timestamp = None
+
+    @classmethod
+    def from_binary(cls, rules: List[Rule], path: str,
+                    default_action: str = 'ALLOW') -> 'ScenarioRunner':
+        """Run directly off a memory-mapped PACKET_DTYPE file."""
+        return cls(rules, PacketBatch.from_binary(path), default_action=default_action)
 
     def run(self):
-        now = datetime.datetime.utcnow().isoformat()
-        for i, pkt in enumerate(self.packets, start=1):
-            action, rule_id = self.engine.evaluate(pkt)
-            record = {
-                'index': i,
-                'timestamp_utc': now,
-                **pkt.to_dict(),
-                'action': action,
-                'matched_rule_id': rule_id
-            }
-            self.results.append(record)
-        return self.results
+        """Evaluate all packets; return (actions, matched_rule_ids) columns.
+
+        Results are kept as parallel columns rather than one dict per
+        packet; the constant timestamp is attached once at export time.
+        """
+        self.run_timestamp = datetime.datetime.utcnow().isoformat()
+        if self.batch is None:
+            self.batch = PacketBatch.from_packets(self.packets)
+        self.actions, self.matched_rule_ids = self.engine.evaluate_batch(self.batch)
+        return self.actions, self.matched_rule_ids
+
+    def run_parallel(self, jobs: Optional[int] = None):
+        """Like run(), but splits the packet list across worker processes.
+
+        Only useful for large scenarios on the pure-Python path: when a
+        compiled matcher is available this delegates to run() — the Numba
+        kernel already parallelizes internally via prange (and its
+        threading layer is not fork-safe), and forking workers on top of
+        it would only oversubscribe the cores. Batch-only runs and
+        single-job calls delegate too.
+        """
+        jobs = jobs or os.cpu_count() or 1
+        if (_numba_match_all is not None or _firewall is not None
+                or self.packets is None or jobs <= 1
+                or len(self.packets) < 2 * jobs):
+            return self.run()
+        self.run_timestamp = datetime.datetime.utcnow().isoformat()
+        step = -(-len(self.packets) // jobs)  # ceil division
+        chunks = [self.packets[i:i + step] for i in range(0, len(self.packets), step)]
+        tasks = [(self.engine.rules, self.engine.default_action, c) for c in chunks]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(_evaluate_packets, tasks))
+        self.actions = [a for actions, _ in parts for a in actions]
+        self.matched_rule_ids = [r for _, rule_ids in parts for r in rule_ids]
+        return self.actions, self.matched_rule_ids
+
+    def _rows(self):
+        if self.actions is None:
+            raise RuntimeError('No results to save. Run the scenario first.')
+        if self.packets is not None:
+            for i, (pkt, action, rule_id) in enumerate(
+                    zip(self.packets, self.actions, self.matched_rule_ids), start=1):
+                yield (i, self.run_timestamp, pkt.src_ip, pkt.dst_ip,
+                       pkt.src_port, pkt.dst_port, pkt.proto, action, rule_id)
+            return
+        # batch-only runs (e.g. from_binary): format rows from the columns
+        b = self.batch
+        for i, (sip, dip, sp, dp, proto, action, rule_id) in enumerate(
+                zip(b.src_ip, b.dst_ip, b.src_port, b.dst_port, b.proto,
+                    self.actions, self.matched_rule_ids), start=1):
+            yield (i, self.run_timestamp,
+                   str(ipaddress.IPv4Address(int(sip))), str(ipaddress.IPv4Address(int(dip))),
+                   int(sp), int(dp), PROTO_NAMES.get(int(proto), str(int(proto))),
+                   action, rule_id)
+
+    def to_records(self):
+        """Materialize results as a list of dicts (the old row shape)."""
+        return [_make_record(*row) for row in self._rows()]
 
     def save_csv(self, path: str):
-        if not self.results:
+        if self.actions is None:
+            # refuse before opening: don't clobber an existing report
             raise RuntimeError('No results to save. Run the scenario first.')
-        keys = list(self.results[0].keys())
-        with open(path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(self.results)
+        # 1 MiB buffer so large scenarios flush in big sequential writes
+        with open(path, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(self.FIELDNAMES)
+            writer.writerows(self._rows())
 
     def save_json(self, path: str):
-        if not self.results:
-            raise RuntimeError('No results to save. Run the scenario first.')
+        records = self.to_records()
+        if orjson is not None:
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+            return
         with open(path, 'w') as f:
-            json.dump(self.results, f, indent=2)
+            json.dump(records, f, indent=2)
 
 # ------------------------- Example Scenarios ---------------------------
 
@@ -190,6 +863,7 @@ def build_args():
     p.add_argument('--scenario', choices=['demo1','order_test'], default='demo1', help='Which demo to run')
     p.add_argument('--out', help='Output CSV path (or .json if you prefer).')
     p.add_argument('--default', choices=['ALLOW','DENY'], default='ALLOW', help='Default policy if no rule matches')
+    p.add_argument('--jobs', type=int, default=1, help='Worker processes for evaluation (1 = in-process)')
     return p.parse_args()
 
 
@@ -206,7 +880,10 @@ def main():
         return
 
     runner = ScenarioRunner(rules, pkts, default_action=args.default)
-    results = runner.run()
+    if args.jobs > 1:
+        actions, rule_ids = runner.run_parallel(args.jobs)
+    else:
+        actions, rule_ids = runner.run()
 
     # print summary
     print('Ran scenario:', args.scenario)
@@ -214,8 +891,8 @@ def main():
     for r in rules:
         print(f'  {r.id}: {r.action} {r.description or ""}')
     print('\nResults:')
-    for r in results:
-        print(f"#{r['index']} {r['src_ip']}:{r['src_port']} -> {r['dst_ip']}:{r['dst_port']} {r['proto']} => {r['action']} (rule={r['matched_rule_id']})")
+    for i, (pkt, action, rule_id) in enumerate(zip(pkts, actions, rule_ids), start=1):
+        print(f"#{i} {pkt.src_ip}:{pkt.src_port} -> {pkt.dst_ip}:{pkt.dst_port} {pkt.proto} => {action} (rule={rule_id})")
 
     if args.out:
         if args.out.lower().endswith('.json'):
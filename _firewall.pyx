@@ -0,0 +1,54 @@
+# cython: boundscheck=False, wraparound=False
+"""
+_firewall.pyx
+
+Optional Cython-compiled matcher for the firewall simulator.
+
+Same contract as firewall_numba.match_all, but ahead-of-time compiled:
+no JIT warm-up, and no numba dependency. Build with
+`python setup.py build_ext --inplace` (requires Cython and a C
+compiler); the simulator picks it up opportunistically.
+
+A src/dst mask of 0 means "any address", a rule protocol of 0 means
+"any protocol".
+"""
+
+from libc.stdint cimport int64_t, uint8_t, uint16_t, uint32_t
+
+
+def match_all(uint32_t[:] src_ip, uint32_t[:] dst_ip,
+              uint16_t[:] src_port, uint16_t[:] dst_port, uint8_t[:] proto,
+              uint32_t[:] r_src_net, uint32_t[:] r_src_mask,
+              uint32_t[:] r_dst_net, uint32_t[:] r_dst_mask, uint8_t[:] r_proto,
+              uint16_t[:] r_sp_lo, uint16_t[:] r_sp_hi,
+              uint16_t[:] r_dp_lo, uint16_t[:] r_dp_hi,
+              int64_t[:] out_rule):
+    """Write the first matching rule index (or -1) per packet into out_rule."""
+    cdef Py_ssize_t i, j
+    cdef Py_ssize_t n_packets = src_ip.shape[0]
+    cdef Py_ssize_t n_rules = r_src_net.shape[0]
+    cdef uint32_t sip, dip
+    cdef uint16_t sp, dp
+    cdef uint8_t pr
+    cdef int64_t hit
+    for i in range(n_packets):
+        sip = src_ip[i]
+        dip = dst_ip[i]
+        sp = src_port[i]
+        dp = dst_port[i]
+        pr = proto[i]
+        hit = -1
+        for j in range(n_rules):
+            if (sip & r_src_mask[j]) != r_src_net[j]:
+                continue
+            if (dip & r_dst_mask[j]) != r_dst_net[j]:
+                continue
+            if r_proto[j] != 0 and r_proto[j] != pr:
+                continue
+            if sp < r_sp_lo[j] or sp > r_sp_hi[j]:
+                continue
+            if dp < r_dp_lo[j] or dp > r_dp_hi[j]:
+                continue
+            hit = j
+            break
+        out_rule[i] = hit
@@ -0,0 +1,44 @@
+"""
+firewall_numba.py
+
+Optional Numba-compiled matcher for the firewall simulator.
+
+Fuses all per-rule field comparisons into one compiled loop so packet
+fields stay in registers across rules and no intermediate boolean arrays
+are materialized. Imported opportunistically by the simulator; if numba
+is not installed the simulator falls back to its NumPy/scalar paths.
+
+Conventions match the Rule precompiled predicates: a src/dst mask of 0
+means "any address", a rule protocol of 0 means "any protocol".
+"""
+
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def match_all(src_ip, dst_ip, src_port, dst_port, proto,
+              r_src_net, r_src_mask, r_dst_net, r_dst_mask, r_proto,
+              r_sp_lo, r_sp_hi, r_dp_lo, r_dp_hi, out_rule):
+    """Write the first matching rule index (or -1) per packet into out_rule."""
+    n_rules = r_src_net.shape[0]
+    for i in prange(src_ip.shape[0]):
+        sip = src_ip[i]
+        dip = dst_ip[i]
+        sp = src_port[i]
+        dp = dst_port[i]
+        pr = proto[i]
+        hit = -1
+        for j in range(n_rules):
+            if (sip & r_src_mask[j]) != r_src_net[j]:
+                continue
+            if (dip & r_dst_mask[j]) != r_dst_net[j]:
+                continue
+            if r_proto[j] != 0 and r_proto[j] != pr:
+                continue
+            if sp < r_sp_lo[j] or sp > r_sp_hi[j]:
+                continue
+            if dp < r_dp_lo[j] or dp > r_dp_hi[j]:
+                continue
+            hit = j
+            break
+        out_rule[i] = hit
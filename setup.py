@@ -0,0 +1,14 @@
+"""Builds the optional _firewall Cython extension.
+
+Usage: python setup.py build_ext --inplace
+The simulator works without it; this just provides a compiled matcher
+for environments where numba is unavailable.
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='firewall-simulator-ext',
+    ext_modules=cythonize('_firewall.pyx', language_level='3'),
+)